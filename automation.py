@@ -2,8 +2,8 @@
 import os
 import re
 import zipfile
-import tempfile
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 import unicodedata
 import pathlib
 from urllib.parse import unquote
@@ -18,106 +18,116 @@ POSTS_DIR = ROOT / "_posts"
 IMAGES_DIR = ROOT / "assets" / "images"
 
 # -------- FUNCIONES --------
+# Tablas para str.translate: un solo bucle en C por carácter, sin motor regex.
+# Tras normalizar a ASCII, cada no-alfanumérico se vuelve '-' (slug) o '_' (imagen)
+# y luego se colapsan las rachas con un regex literal trivial.
+_SLUG_TABLE = str.maketrans({c: "-" for c in map(chr, range(128))
+                             if not ("a" <= c <= "z" or "0" <= c <= "9")})
+_IMG_TABLE = str.maketrans({c: "_" for c in map(chr, range(128)) if not c.isalnum()})
+_DASH_RUN_RE = re.compile(r"-{2,}")
+_UNDERSCORE_RUN_RE = re.compile(r"_{2,}")
+_NON_ALNUM_RE = re.compile(r"[^A-Za-z0-9]+")
+
 def slugify(name: str) -> str:
     """Crea un slug limpio a partir de un nombre."""
     name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
     name = name.lower()
-    name = re.sub(r"[^a-z0-9]+", "-", name).strip("-")
+    name = _DASH_RUN_RE.sub("-", name.translate(_SLUG_TABLE)).strip("-")
     return name or "post"
 
 def sanitize_img(name: str) -> str:
     base, ext = os.path.splitext(os.path.basename(name))
-    base = unquote(base)
-    base = re.sub(r"[^A-Za-z0-9]+", "_", base).strip("_")
-    if not base:
-        base = "img"
     ext = ext.lower() if ext else ".png"
     if ext not in IMG_EXTS:
         ext = ".png"
+    # Atajo: nombres ya limpios (solo alfanuméricos ASCII, lo habitual en
+    # exports de Notion) salen tal cual, sin unquote ni translate
+    if base.isascii() and base.isalnum():
+        return f"{base}{ext}"
+    base = unquote(base)
+    if base.isascii():
+        base = _UNDERSCORE_RUN_RE.sub("_", base.translate(_IMG_TABLE)).strip("_")
+    else:
+        # unquote puede producir no-ASCII; ahí la tabla no alcanza
+        base = _NON_ALNUM_RE.sub("_", base).strip("_")
+    if not base:
+        base = "img"
     return f"{base}{ext}"
 
-def build_new_img_name(slug: str, orig_path: str) -> str:
-    return f"{slug}_{sanitize_img(orig_path)}"
+# Patrón combinado para imágenes Markdown y HTML (una sola pasada sobre el texto)
+COMBINED_IMG_RE = re.compile(
+    r'!\[(?P<alt>[^\]]*)\]\((?P<mdsrc>[^)]+)\)'
+    r'|<img\s+[^>]*src=["\'](?P<htmlsrc>[^"\']+)["\'](?P<rest>[^>]*)>',
+    re.IGNORECASE)
 
-# Patrones para imágenes Markdown y HTML
-MD_IMG_RE = re.compile(r'!\[(?P<alt>[^\]]*)\]\((?P<src>[^)]+)\)')
-HTML_IMG_RE = re.compile(r'<img\s+[^>]*src=["\'](?P<src>[^"\']+)["\'](?P<rest>[^>]*)>', re.IGNORECASE)
-
-def replace_markdown_images(text, mapping, slug):
+def replace_images(text, mapping, slug):
+    prefix = f"/assets/images/{slug}/"  # invariante por post: fuera del closure
     def _sub(m):
-        alt = m.group('alt')
-        src = unquote(m.group('src').strip())
+        mdsrc = m.group('mdsrc')
+        src = unquote((mdsrc if mdsrc is not None else m.group('htmlsrc')).strip())
         key = os.path.basename(src).lower()
-        new_fn = mapping.get(key)
+        # el mapping guarda claves saneadas: probar directo y, si falla,
+        # normalizar la referencia igual que el nombre original
+        new_fn = mapping.get(key) or mapping.get(sanitize_img(key).lower())
         if not new_fn:
             return m.group(0)
-        new_path = f"/assets/images/{slug}/{new_fn}"
-        return f"![{alt}]({{{{ '{new_path}' | relative_url }}}})"
-    return MD_IMG_RE.sub(_sub, text)
-
-def replace_html_images(text, mapping, slug):
-    def _sub(m):
-        src = unquote(m.group('src').strip())
+        if mdsrc is not None:
+            return f"![{m.group('alt')}]({{{{ '{prefix}{new_fn}' | relative_url }}}})"
         rest = m.group('rest') or ""
-        key = os.path.basename(src).lower()
-        new_fn = mapping.get(key)
-        if not new_fn:
-            return m.group(0)
-        new_path = f"/assets/images/{slug}/{new_fn}"
-        return f"<img src=\"{{{{ '{new_path}' | relative_url }}}}\"{rest}>"
-    return HTML_IMG_RE.sub(_sub, text)
-
-def find_first_markdown(path: pathlib.Path):
-    for p in path.rglob("*"):
-        if p.suffix.lower() in (".md", ".markdown"):
-            return p
-    return None
-
-def collect_images(path: pathlib.Path):
-    imgs = []
-    for p in path.rglob("*"):
-        if p.is_file() and p.suffix.lower() in IMG_EXTS:
-            imgs.append(p)
-    return imgs
+        return f"<img src=\"{{{{ '{prefix}{new_fn}' | relative_url }}}}\"{rest}>"
+    return COMBINED_IMG_RE.sub(_sub, text)
+
+MD_EXTS = {".md", ".markdown"}
 
 def process_zip(zip_path: pathlib.Path, date=POST_DATE, category=POST_CATEGORY):
     slug = slugify(zip_path.stem)
     print(f"== Procesando {zip_path.name} -> slug: {slug}")
 
-    tmpdir = pathlib.Path(tempfile.mkdtemp(prefix="notion_zip_"))
-    try:
-        with zipfile.ZipFile(zip_path, "r") as zf:
-            zf.extractall(tmpdir)
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        infos = [info for info in zf.infolist() if not info.is_dir()]
 
-        # Buscar markdown
-        md_in = find_first_markdown(tmpdir)
-        if not md_in:
+        # Buscar el primer markdown en el índice del zip (sin extraer nada)
+        md_info = None
+        for info in infos:
+            if os.path.splitext(info.filename)[1].lower() in MD_EXTS:
+                md_info = info
+                break
+        if md_info is None:
             print(f"  [WARN] No se encontró archivo markdown en {zip_path.name}")
+            # ya no extraemos a un tmpdir para inspeccionar: listamos el contenido
+            for info in infos:
+                print(f"         - {info.filename}")
             return
 
-        post_title = md_in.stem or slug
+        post_title = pathlib.Path(md_info.filename).stem or slug
 
         # Preparar destino imágenes
         img_dest_dir = IMAGES_DIR / slug
         img_dest_dir.mkdir(parents=True, exist_ok=True)
+        img_dest_str = os.fspath(img_dest_dir)  # join de strings en el bucle
 
-        # Copiar imágenes + mapping
+        # Volcar imágenes directo del zip al destino final + mapping
+        # (una sola escritura por imagen, sin tmpdir intermedio)
         mapping = {}
-        for img_path in collect_images(tmpdir):
-            new_name = build_new_img_name(slug, img_path.name)
-            shutil.copy2(img_path, img_dest_dir / new_name)
-            mapping[img_path.name.lower()] = new_name
-            mapping[sanitize_img(img_path.name).lower()] = new_name
-
-        # Leer markdown original
-        md_text = md_in.read_text(encoding="utf-8")
-
-        # Reemplazar referencias de imágenes
-        md_text = replace_markdown_images(md_text, mapping, slug)
-        md_text = replace_html_images(md_text, mapping, slug)
-
-        # Crear front matter
-        front_matter = f"""---
+        for info in infos:
+            if os.path.splitext(info.filename)[1].lower() not in IMG_EXTS:
+                continue
+            img_name = os.path.basename(info.filename)
+            sanitized = sanitize_img(img_name)  # una sola vez por imagen
+            new_name = f"{slug}_{sanitized}"
+            with zf.open(info) as src, open(os.path.join(img_dest_str, new_name), "wb") as dst:
+                shutil.copyfileobj(src, dst, length=1 << 20)
+            # una sola clave normalizada por imagen; el lookup sanea en el miss
+            mapping[sanitized.lower()] = new_name
+
+        # Leer markdown original directo del zip
+        md_text = zf.read(md_info).decode("utf-8")
+
+    # Reemplazar referencias de imágenes (Markdown y HTML en una pasada)
+    md_text = replace_images(md_text, mapping, slug)
+
+    # Crear front matter
+    front_matter = f"""---
 layout: post
 title: "{post_title}"
 date: {date}
@@ -125,18 +135,16 @@ categories: {category}
 ---
 
 """
-        final_text = front_matter + md_text
+    final_text = front_matter + md_text
 
-        # Guardar post
-        post_filename = f"{date}-{slug}.markdown"
-        POSTS_DIR.mkdir(exist_ok=True)
-        out_path = POSTS_DIR / post_filename
-        out_path.write_text(final_text, encoding="utf-8")
+    # Guardar post
+    post_filename = f"{date}-{slug}.markdown"
+    out_path = POSTS_DIR / post_filename
+    # write_bytes: un solo write() sin la capa TextIOWrapper
+    out_path.write_bytes(final_text.encode("utf-8"))
 
-        print(f"  [OK] Post: {out_path}")
-        print(f"  [OK] Imágenes: {img_dest_dir}")
-    finally:
-        shutil.rmtree(tmpdir)
+    print(f"  [OK] Post: {out_path}")
+    print(f"  [OK] Imágenes: {img_dest_dir}")
 
 def main():
     import sys
@@ -147,9 +155,23 @@ def main():
     if not zips_dir.is_dir():
         print(f"No existe el directorio: {zips_dir}")
         return
-    # Ordenar de más viejo a más nuevo
-    for zp in sorted(zips_dir.glob("*.zip"), key=lambda x: x.stat().st_mtime):
-        process_zip(zp)
+    # Ordenar de más viejo a más nuevo (scandir cachea el stat del DirEntry,
+    # sin el stat() extra por archivo que costaba glob + Path.stat)
+    with os.scandir(zips_dir) as it:
+        zips = [e for e in it if e.is_file() and e.name.lower().endswith(".zip")]
+    zips.sort(key=lambda e: e.stat().st_mtime)
+    zip_paths = [pathlib.Path(e.path) for e in zips]
+
+    POSTS_DIR.mkdir(exist_ok=True)  # directorio compartido: crear antes del pool
+
+    # Cada zip es independiente (slug y archivos de salida disjuntos),
+    # así que se procesan en paralelo; la fecha es constante, el orden da igual
+    if len(zip_paths) > 1:
+        with ProcessPoolExecutor() as ex:
+            list(ex.map(process_zip, zip_paths))
+    else:
+        for zp in zip_paths:
+            process_zip(zp)
 
 
 
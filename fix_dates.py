@@ -8,12 +8,21 @@ NEW_DATE = "2025-07-17 12:05:57 -0400"
 # Directorio con los posts
 POSTS_DIR = pathlib.Path("temp")
 
+# Patrón compilado una sola vez (evita la búsqueda en caché de re por archivo)
+DATE_RE = re.compile(r'^date:\s+.*$', re.MULTILINE)
+
 def fix_date_in_file(file_path):
-    text = file_path.read_text(encoding="utf-8")
-    # Reemplaza cualquier línea que empiece con 'date:'
-    new_text = re.sub(r'^date:\s+.*$', f'date:   {NEW_DATE}', text, flags=re.MULTILINE)
-    if new_text != text:
-        file_path.write_text(new_text, encoding="utf-8")
+    text = file_path.read_bytes().decode("utf-8")
+    # El 'date:' vive en el front matter YAML inicial: limitamos el regex a
+    # esa rebanada en vez de recorrer el post completo
+    end = text.find("---", 4) if text.startswith("---") else -1
+    if end == -1:
+        head, tail = text, ""
+    else:
+        head, tail = text[:end], text[end:]
+    new_head = DATE_RE.sub(f'date:   {NEW_DATE}', head)
+    if new_head != head:
+        file_path.write_bytes((new_head + tail).encode("utf-8"))
         print(f"[OK] Fecha cambiada en: {file_path}")
     else:
         print(f"[INFO] No se encontró date: en {file_path}")
@@ -33,6 +33,20 @@ RE_HEADER = re.compile(r'^(#{1,6})\s+\S')              # encabezados Markdown
 RE_IMAGE = re.compile(r'!\[[^\]]*\]\([^)]+\)')         # patrón básico imágenes
 RE_FENCE  = re.compile(r'^(```|~~~)')                  # bloques de código cercados
 
+# Detecta cualquier cosa que el pipeline corregiría (conservador: un falso
+# positivo solo cuesta correr el pipeline completo, nunca salta un cambio):
+#   - blanks múltiples / líneas "en blanco" con espacios
+#   - encabezado o imagen sin línea en blanco antes o después
+RE_UNFORMATTED = re.compile(
+    r'\A[ \t]*\n[ \t]*\n'                              # doble blank al inicio
+    r'|\n[ \t]*\n[ \t]*\n'                             # blanks consecutivos
+    r'|^[ \t]+$'                                       # blank con espacios
+    r'|^[ \t]*#{1,6}[ \t]+\S[^\n]*\n[ \t]*\S'          # encabezado sin blank después
+    r'|\S[^\n]*\n[ \t]*#{1,6}[ \t]+\S'                 # encabezado sin blank antes
+    r'|!\[[^\]]*\]\([^)]+\)[^\n]*\n[ \t]*\S'           # imagen sin blank después
+    r'|\S[^\n]*\n[^\n]*!\[[^\]]*\]\([^)]+\)',          # imagen sin blank antes
+    re.MULTILINE)
+
 def split_front_matter(lines):
     """
     Detecta front matter YAML al inicio (--- ... ---).
@@ -52,87 +66,69 @@ def split_front_matter(lines):
     # si nunca cierra, tratamos todo como contenido para no destruir archivo
     return [], lines[:]
 
-def ensure_blank_after(current_lines, idx):
-    """
-    Inserta línea en blanco después de current_lines[idx] si la siguiente
-    línea (ya existente) no es blank y no es EOF.
-    Trabaja sobre lista mutable.
-    """
-    if idx + 1 < len(current_lines):
-        if current_lines[idx + 1].strip() != "":
-            current_lines.insert(idx + 1, "\n")
-            return True
-    return False
-
-def process_content_lines(lines):
+def process_content_stream(lines):
     """
-    Reformatea contenido:
+    Reformatea contenido (generador: va cediendo líneas procesadas):
       - Inserta blank line después de encabezado.
       - Inserta blank line antes y después de imagen.
       - Colapsa múltiples blanks consecutivos.
       - Respeta fences de código.
-    Devuelve nueva lista de líneas.
+    Solo guarda estado mínimo (booleanos) en vez de la lista completa.
     """
-    out = []
     in_code = False
+    emitted_any = False   # ¿ya emitimos algo? (equivale a out no vacío)
+    prev_blank = False    # ¿la última línea emitida fue blank?
+    need_blank = False    # imagen/encabezado pide blank antes de la próxima no-blank
 
-    # Usamos iteración manual para poder mirar adelante/atrás
-    i = 0
-    L = len(lines)
-    while i < L:
-        line = lines[i]
+    for line in lines:
+        stripped = line.strip()
+
+        # blank pendiente tras imagen/encabezado (solo si lo siguiente no es blank)
+        if need_blank:
+            need_blank = False
+            if stripped != "":
+                yield "\n"
+                prev_blank = True
+                emitted_any = True
 
         # detectar inicio / cierre de code fence
-        if RE_FENCE.match(line.strip()):
+        if RE_FENCE.match(stripped):
             in_code = not in_code
-            out.append(line)
-            i += 1
+            yield line
+            prev_blank = False
+            emitted_any = True
             continue
 
         if in_code:
-            out.append(line)
-            i += 1
+            yield line
+            prev_blank = (stripped == "")
+            emitted_any = True
             continue
 
-        stripped = line.strip()
-
-        # Imagen Markdown
-        if RE_IMAGE.search(stripped):
+        # Imagen Markdown o encabezado: blank antes y después
+        if RE_IMAGE.search(stripped) or RE_HEADER.match(stripped):
             # asegurar línea en blanco anterior (si la previa no es blank y hay previa)
-            if out and out[-1].strip() != "":
-                out.append("\n")
-            out.append(line if line.endswith("\n") else line + "\n")
-            # asegurar línea en blanco siguiente: miramos la siguiente línea original
-            if i + 1 < L and lines[i+1].strip() != "":
-                out.append("\n")
-            i += 1
-            continue
-
-        # Encabezado
-        if RE_HEADER.match(stripped):
-            # asegurar blank antes (excepto si es primera línea de contenido)
-            if out and out[-1].strip() != "":
-                out.append("\n")
-            out.append(line if line.endswith("\n") else line + "\n")
-            # blank después si próxima no está vacía
-            if i + 1 < L and lines[i+1].strip() != "":
-                out.append("\n")
-            i += 1
+            if emitted_any and not prev_blank:
+                yield "\n"
+            yield line if line.endswith("\n") else line + "\n"
+            prev_blank = False
+            emitted_any = True
+            need_blank = True
             continue
 
         # Línea en blanco: colapsar múltiples
         if stripped == "":
             # solo añadir una línea en blanco si la última no fue blank
-            if not out or out[-1].strip() != "":
-                out.append("\n")
-            i += 1
+            if not emitted_any or not prev_blank:
+                yield "\n"
+                prev_blank = True
+                emitted_any = True
             continue
 
         # Línea normal de texto
-        out.append(line if line.endswith("\n") else line + "\n")
-        i += 1
-
-    return out
+        yield line if line.endswith("\n") else line + "\n"
+        prev_blank = False
+        emitted_any = True
 
 def append_css_link_if_missing(lines):
     """
@@ -140,9 +136,8 @@ def append_css_link_if_missing(lines):
     la agrega con dos saltos antes para separar del contenido.
     """
     # Buscar sin necesidad de coincidir exactamente: busco substring 'imagesstyle.css'
-    needle = "imagesstyle.css"
-    joined = "".join(lines)
-    if needle in joined:
+    # línea a línea (corta en cuanto aparece, sin concatenar todo el archivo)
+    if any("imagesstyle.css" in ln for ln in lines):
         return lines
     # agregar 2 saltos y la línea
     if lines and lines[-1].strip() != "":
@@ -152,17 +147,27 @@ def append_css_link_if_missing(lines):
     return lines
 
 def process_file(path: Path, dry_run=False):
-    with path.open(encoding="utf-8") as f:
-        original = f.readlines()
+    # lectura cruda + decode único (sin TextIOWrapper; los posts son UTF-8/LF)
+    text = path.read_bytes().decode("utf-8")
+
+    # Atajo para el caso común de re-ejecutar sobre posts ya formateados:
+    # si el link CSS ya está y no se detecta nada que corregir, no hay
+    # que correr el pipeline completo.
+    if ("imagesstyle.css" in text and text.endswith("\n")
+            and RE_UNFORMATTED.search(text) is None):
+        return False
+
+    original = text.splitlines(keepends=True)
 
     front, content = split_front_matter(original)
 
-    new_content = process_content_lines(content)
+    new_content = list(process_content_stream(content))
     new_content = append_css_link_if_missing(new_content)
 
-    new_lines = front + new_content
+    # comparar el texto completo (memcmp en C) en vez de lista contra lista
+    new_text = "".join(front) + "".join(new_content)
 
-    if new_lines == original:
+    if new_text == text:
         return False  # sin cambios
 
     if dry_run:
@@ -173,8 +178,7 @@ def process_file(path: Path, dry_run=False):
     backup = path.with_suffix(path.suffix + ".bak")
     shutil.copy2(path, backup)
 
-    with path.open("w", encoding="utf-8", newline="\n") as f:
-        f.writelines(new_lines)
+    path.write_bytes(new_text.encode("utf-8"))
 
     print(f"[OK] Reformateado: {path} (backup: {backup.name})")
     return True